@@ -34,97 +34,163 @@
 
 # ### Read the data
 # 
-# We'll import the NumPy and Pandas libraries and then read the CSV file into Pandas.
+# We'll import the NumPy and Pandas libraries and then read the CSV file into Pandas. Pandas also needs the [pyarrow](https://arrow.apache.org/docs/python/) library installed (e.g. `pip install pyarrow`), which we use for the text columns of the cleaned data and to save that data to a Parquet file.
+# 
+# Formatting a dataframe for display is relatively slow, so the cells that only preview the data (like `DataFrame.head()` and `DataFrame.describe()`) are only displayed when the `DEBUG` flag is set.
+# 
+# The cleaned data is saved to a Parquet file at the end of the cleaning steps. When the notebook is re-run with `DEBUG` set to `False` and that file is newer than `autos.csv`, the `USE_CACHE` flag is set: the cells that read and clean the data are skipped, and the cleaned data is loaded from the file at the start of the analysis instead. With `DEBUG` set, the cleaning steps always run (and save the file again), so changes to them are never hidden by old saved data.
 
-# In[2]:
+# In[1]:
 
 
+import codecs
+import os
+import re
+
 import pandas as pd
 import numpy as np
+from IPython.display import display
 
+# set to False to skip the cells that only preview the dataframe when re-running the whole notebook
+DEBUG = True
+# the cleaned dataframe is saved to this file so the analysis can be re-run without cleaning the data again
+CLEAN_PATH = 'autos_clean.parquet'
+# The saved data is only reused by batch re-runs (DEBUG = False) and only while it is newer than autos.csv,
+# so an interactive run always goes through the cleaning steps again and picks up any changes to them
+USE_CACHE = (not DEBUG and os.path.exists(CLEAN_PATH)
+             and os.path.getmtime(CLEAN_PATH) > os.path.getmtime('autos.csv'))
+if USE_CACHE:
+    print(f'skipping the cleaning steps, the cleaned data is loaded from {CLEAN_PATH}')
 
-# First, we'll try to read the file without specifying any encoding (which will default to **UTF-8** which is the most common encoding) 
-
-# In[3]:
-
-
-## autos = pd.read_csv('autos.csv') Gives the UnicodeDecodeError
 
+# If we read the file without specifying any encoding, pandas defaults to **UTF-8** (which is the most common encoding) and gives a `UnicodeDecodeError`, so our file is in some other encoding.
 
-# Since our file has an unknown encoding, we try other common encodings:
+# Rather than trying other common encodings such as:
 # 
 # * **Latin-1 (also known as ISO-8859-1)**
 # * **Windows-1251**
 # 
-# until we are able to read the file without error.
+# until we are able to read the file without error, we pick the encoding to try from a small sample of the file's bytes. We check for a UTF-8 [byte order mark](https://en.wikipedia.org/wiki/Byte_order_mark) first, then whether the sample decodes as UTF-8, and otherwise use **Windows-1252**. A small sample can't reliably tell the single-byte encodings apart, so we always choose this Western European encoding, which matches Latin-1 for all printable characters and suits German listings.
+# 
+# Since only the sample is checked, the rest of the file may still contain bytes the chosen encoding can't decode (Windows-1252 leaves a few byte values undefined). In that case we read the file again as **Latin-1**, which decodes any byte.
 
-# In[4]:
+# In[2]:
+
+
+def detect_encoding(path, sample_size=64 * 1024):
+    """Pick the encoding to read a text file with, based on its first `sample_size` bytes."""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # an incremental decoder accepts a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # guessing between single-byte encodings from a sample is unreliable, so we always use the Western one
+        return 'cp1252'
+
+
+if not USE_CACHE:
+    encoding = detect_encoding('autos.csv')
+    display(encoding)
+
+
+# In[3]:
 
 
 #reads file without error
-autos = pd.read_csv('autos.csv', encoding='Latin-1') 
+# declaring the dtypes up front lets pandas skip type inference for these columns,
+# and the converters strip the extra characters from `price` and `odometer` while parsing.
+# memory_map=True maps the file into memory instead of reading it through a file buffer
+read_options = dict(dtype={'seller': 'category', 'offerType': 'category', 'abtest': 'category',
+                           'vehicleType': 'category', 'gearbox': 'category', 'fuelType': 'category',
+                           'brand': 'category', 'notRepairedDamage': 'category',
+                           'yearOfRegistration': 'int16', 'powerPS': 'int16',
+                           'monthOfRegistration': 'int8', 'nrOfPictures': 'int8',
+                           'postalCode': 'int32'},
+                    parse_dates=['dateCrawled', 'dateCreated', 'lastSeen'],
+                    memory_map=True,
+                    converters={'price': lambda s: int(s.replace('$', '').replace(',', '')),
+                                'odometer': lambda s: int(s.replace('km', '').replace(',', ''))}
+                    )
+if not USE_CACHE:
+    try:
+        autos = pd.read_csv('autos.csv', encoding=encoding, **read_options)
+    except UnicodeDecodeError:
+        # the sample missed bytes the chosen encoding can't decode, while Latin-1 decodes any byte
+        autos = pd.read_csv('autos.csv', encoding='latin-1', **read_options)
 
 
-# In[5]:
+# In[4]:
 
 
 #jupyter notebook renders the first few and last few values of any pandas object
-autos
+if DEBUG:
+    display(autos)
 
 
-# In[6]:
+# In[5]:
 
 
-autos.info() #prints information about the autos dataframe 
-autos.head() #first few rows of autos
+if DEBUG:
+    autos.info() #prints information about the autos dataframe 
+    display(autos.head()) #first few rows of autos
 
 
 # We observe that:
-# * The dataset contains 20 columns, most of which are stored as strings. 
+# * The dataset contains 20 columns. The text columns with only a few distinct values are stored as categories, as declared when reading the file. 
 # * Some columns have null values, but none have more than ~20% null values. 
-# * There are some columns that contain dates stored as strings.
+# * There are some columns that contain dates, which we parsed as datetime values while reading the file.
 # * The column names use [camelcase](https://en.wikipedia.org/wiki/Camel_case) instead of Python's preferred [snakecase](https://en.wikipedia.org/wiki/Snake_case), which means we can't just replace spaces with underscores.
 
 # ### Data Cleaning 
 # 
 # We'll start by cleaning the column names to make the data easier to work with.
 
-# In[7]:
+# In[6]:
 
 
-autos.columns #columns attribute prints an array of existing column names
+if not USE_CACHE:
+    display(autos.columns) #columns attribute prints an array of existing column names
 
 
 # We'll make a few changes here:
 # 
-# * Convert the column names from camelcase to snakecase.
+# * Convert the column names from camelcase to snakecase, by inserting an underscore wherever a lowercase letter is followed by an uppercase one and then lowercasing the whole name.
 # * Reword some column names based on the data dictionary to make them more descriptive.
 
-# In[8]:
+# In[7]:
 
 
-autos.columns = ['date_crawled', 'name', 'seller', 'offer_type', 'price', 'ab_test',
-       'vehicle_type', 'registration_year', 'gearbox', 'power_ps', 'model',
-       'odometer', 'registration_month', 'fuel_type', 'brand',
-       'unrepaired_damage', 'ad_created', 'num_photos', 'postal_code',
-       'last_seen']
+if not USE_CACHE:
+    camel_boundary = re.compile(r'(?<=[a-z])(?=[A-Z])') # position between a lowercase and an uppercase letter
+    autos.columns = [camel_boundary.sub('_', col).lower() for col in autos.columns]
+    autos.rename({'abtest': 'ab_test', 'year_of_registration': 'registration_year',
+                  'odometer': 'odometer_km', 'month_of_registration': 'registration_month',
+                  'not_repaired_damage': 'unrepaired_damage', 'date_created': 'ad_created',
+                  'nr_of_pictures': 'num_photos'}, axis=1, inplace=True)
+    display(autos.columns)
 
 
-# In[9]:
+# In[8]:
 
 
-autos.head() #look at the current state of the autos dataframe
+if DEBUG:
+    display(autos.head()) #look at the current state of the autos dataframe
 
 
 # ### Initial Data Exploration and Cleaning 
 # 
 # We'll start by exploring the data to find obvious areas where we can clean the data.
 
-# In[10]:
+# In[9]:
 
 
 # Using `DataFrame.describe()` method to look at descriptive statistics for all columns with `include='all'` to get both categorical and numeric columns
-autos.describe(include="all")
+if DEBUG:
+    display(autos.describe(include="all"))
 
 
 # Our initial observations:
@@ -136,105 +202,165 @@ autos.describe(include="all")
 # 
 # 
 
+# In the descriptive statistics, the minimum and maximum of `num_photos` are both 0, so it looks like the column has 0 for every row. We only need to confirm that it holds a single unique value, which `Series.nunique()` tells us without building the full table of counts, and then we'll drop this column.
+# 
+# Since, columns that have mostly one value are candidates to be dropped.
+# We drop `seller` and `offer_type` columns too.
+# 
+# To avoid copying the whole dataframe twice, the columns are removed together with the invalid rows we'll find below.
+
+# In[10]:
+
+
+if not USE_CACHE:
+    drop_columns = ["seller", "offer_type"]
+    # a column holding a single unique value carries no information
+    if autos["num_photos"].nunique() <= 1:
+        drop_columns.append("num_photos")
+    display(drop_columns)
+
+
+# There are two columns, `price` and `odometer`, which are numeric values with extra characters being stored as text. The converters we passed to `read_csv()` already removed these characters, so both columns are numeric. We also renamed `odometer` to `odometer_km` above, to keep the unit in the column name.
+
 # In[11]:
 
 
-autos["num_photos"].value_counts() #Return a Series containing counts of unique values in descending order 
+if DEBUG:
+    display(autos[["price", "odometer_km"]].head())
 
 
-# It looks like the `num_photos` column has 0 for every column. We'll drop this column.
+# ### Exploring odometer and price column
 # 
-# Since, columns that have mostly one value are candidates to be dropped.
-# We drop `seller` and `offer_type` columns too. 
+# We'll analyze the columns using minimum and maximum values and look for any values that look unrealistically high or low (outliers) that we might want to remove.
 
 # In[12]:
 
 
-autos = autos.drop(["num_photos", "seller", "offer_type"], axis=1) #Removes rows or columns by specifying label names and corresponding axis(0 or 'index' for row, 1 or ' columns' for column )
+if not USE_CACHE:
+    display(autos["odometer_km"].value_counts())
 
 
-# There are two columns, `price` and `odometer`, which are numeric values with extra characters being stored as text. We'll clean and convert these.
+# We can see that the values in `odometer_km` field are rounded, which might indicate that sellers had to choose from pre-set options for this field. Also, there are more high mileage than low mileage vehicles.
 
 # In[13]:
 
 
-#Removing non numeric characters from `price` column and conerting it to numeric dtype
-autos["price"] = (autos["price"]
-                          .str.replace("$","")
-                          .str.replace(",","")
-                          .astype(int)
-                          )
-autos["price"].head()
+if not USE_CACHE:
+    price_counts = autos["price"].value_counts() # counts of each unique price, reused in the cells below
+    print(price_counts.shape) # to see how many unique values are there
+    print(autos["price"].describe()) #to view min/max/median/mean etc.
+    # using series.value_cunts() chained to .head() as there are lot of values
+    display(price_counts.head(20))
 
 
-# In[14]:
+# Again, the prices in this column seem rounded, however given there are 2357 unique values in the column, that may just be people's tendency to round prices on the site.
+# 
+# There are 1,421 cars listed with $0 price - given that this is only 2% of the of the cars, we might consider removing these rows. The maximum price is one hundred million dollars, which seems a lot, let's look at the highest prices further.
+# 
 
+# In[14]:
 
-#Removing non numeric characters from `odometer` column and conerting it to numeric dtype
-autos["odometer"] = (autos["odometer"]
-                             .str.replace("km","")
-                             .str.replace(",","")
-                             .astype(int)
-                             )
-#Renaming the column 
-# axis=1 as column is to be renamed
-# Inplace = True then dataframe copy is ignored.
-autos.rename({"odometer": "odometer_km"}, axis=1, inplace=True)
-autos["odometer_km"].head()
 
+# np.partition() moves the 20 highest prices to the end of the array without sorting all the unique prices,
+# so only those 20 need to be sorted before looking up their counts
+if not USE_CACHE:
+    highest_prices = np.sort(np.partition(price_counts.index.to_numpy(), -20)[-20:])[::-1]
+    display(price_counts.loc[highest_prices])
 
-# ### Exploring odometer and price column
-# 
-# We'll analyze the columns using minimum and maximum values and look for any values that look unrealistically high or low (outliers) that we might want to remove.
 
 # In[15]:
 
 
-autos["odometer_km"].value_counts()
+# in the same way, the 20 lowest prices are moved to the start of the array
+if not USE_CACHE:
+    lowest_prices = np.sort(np.partition(price_counts.index.to_numpy(), 19)[:20])
+    display(price_counts.loc[lowest_prices])
 
 
-# We can see that the values in `odometer_km` field are rounded, which might indicate that sellers had to choose from pre-set options for this field. Also, there are more high mileage than low mileage vehicles.
+# There are a number of listings with prices below \$30, including about 1,500 at \$0. There are also a small number of listings with very high values, including 14 at around or over $1 million.
+# 
+# Given that eBay is an auction site, there could legitimately be items where the opening bid is \$1. We will keep the \$1 items, but remove anything above \$350,000 since it seems that prices increase steadily to that number and then jump up to less realistic numbers.
 
 # In[16]:
 
 
-print(autos["price"].unique().shape) # to see how many unique values are there
-print(autos["price"].describe()) #to view min/max/median/mean etc.
-# using series.value_cunts() chained to .head() as there are lot of values
-autos["price"].value_counts().head(20)
+# for removing outliers, we can do df[(df["col"] > x ) & (df["col"] < y )]
+# using df["col"].between(x,y) for more readability
+# we only build the boolean mask here, the rows are removed together with the invalid registration years below
+if not USE_CACHE:
+    price_in_range = autos["price"].between(1,351000)
+    display(autos.loc[price_in_range, "price"].describe())
 
 
-# Again, the prices in this column seem rounded, however given there are 2357 unique values in the column, that may just be people's tendency to round prices on the site.
-# 
-# There are 1,421 cars listed with $0 price - given that this is only 2% of the of the cars, we might consider removing these rows. The maximum price is one hundred million dollars, which seems a lot, let's look at the highest prices further.
-# 
+# Before removing these rows, we'll also look at the `registration_year` column, so that we can remove all the invalid rows in a single step.
 
 # In[17]:
 
 
-# using Series.sort_index() with ascending= False to view the highest values with their counts 
-autos["price"].value_counts().sort_index(ascending=False).head(20)
+# Using Series.describe() to understand the distribution of registration_year
+if not USE_CACHE:
+    display(autos["registration_year"].describe())
+
 
+# The year that the car was first registered will likely indicate the age of the car. Looking at this column, we note some odd values. The minimum value is `1000`, long before cars were invented and the maximum is `9999`, many years into the future.
+
+# #### Dealing with Incorrect Registration Year Data
+# 
+# Since a car can't be first registered after the listing was seen, any vehicle with a registration year above 2016 is definitely inaccurate. Determining the earliest valid year is more difficult. Realistically, it could be somewhere in the first few decades of the 1900s.
+# 
+# One option is to remove the listings with these values. Let's determine what percentage of our data has invalid values (listings that fall outside the 1900 - 2016 intrval) in this column and see if it's safe to remove those rows entirely or we need more custom logic.
+# 
 
 # In[18]:
 
 
-# using Series.sort_index() with ascending= True to view the lowest values with their counts 
+if not USE_CACHE:
+    year_in_range = autos["registration_year"].between(1900,2016)
+    # share of invalid registration years among the listings we keep based on their price,
+    # counted directly on the underlying numpy arrays
+    price_kept = price_in_range.to_numpy()
+    display(np.count_nonzero(price_kept & ~year_in_range.to_numpy()) / np.count_nonzero(price_kept))
 
-autos["price"].value_counts().sort_index(ascending=True).head(20)
 
+# Given that this is less than 4% of our data, we will remove these rows together with the price outliers.
 
-# There are a number of listings with prices below \$30, including about 1,500 at \$0. There are also a small number of listings with very high values, including 14 at around or over $1 million.
+# In[19]:
+
+
+# Combining both masks selects the rows within the valid `price` and `registration_year` ranges in a single subset,
+# which also removes the columns we decided to drop
+if not USE_CACHE:
+    keep_columns = autos.columns.drop(drop_columns)
+    autos = autos.loc[price_in_range & year_in_range, keep_columns].reset_index(drop=True)
+    # Calculating distribution of remaining values
+    display(autos["registration_year"].value_counts(normalize=True).head(10))
+
+
+# It appears that most of the vehicles were first registered in the past 20 years.
+
+# With the outliers removed, the largest price is \$350,000 and the largest mileage is 150,000km, so both columns fit in 32-bit integers. The other numeric columns were already read with narrow integer types.
 # 
-# Given that eBay is an auction site, there could legitimately be items where the opening bid is \$1. We will keep the \$1 items, but remove anything above \$350,000 since it seems that prices increase steadily to that number and then jump up to less realistic numbers.
+# The `name` and `model` columns have too many distinct values to be stored as categories. We store them as [Apache Arrow](https://arrow.apache.org/) backed strings instead, which keep all the characters in one contiguous buffer rather than as a separate Python object per row.
 
-# In[19]:
+# In[20]:
 
 
-# for removing outliers, we can do df[(df["col"] > x ) & (df["col"] < y )]
-# using df[df["col"].between(x,y)] for more readability
-autos = autos[autos["price"].between(1,351000)]
-autos["price"].describe()
+# Downcasting from int64 halves the memory the later aggregations have to read,
+# and the Arrow-backed strings replace one Python object per row with a single buffer
+if not USE_CACHE:
+    autos = autos.astype({"price": "int32", "odometer_km": "int32",
+                          "name": "string[pyarrow]", "model": "string[pyarrow]"})
+    if DEBUG:
+        display(autos.dtypes)
+
+
+# This completes the cleaning, so we save the cleaned dataframe to a [Parquet](https://parquet.apache.org/) file. Parquet stores each column in a binary format together with its dtype, so loading it doesn't need any of the parsing and cleaning steps above. Later runs of the notebook load this file instead of repeating them.
+
+# In[21]:
+
+
+if not USE_CACHE:
+    autos.to_parquet(CLEAN_PATH, index=False)
 
 
 # We'll now move on to the date columns and understand the date range the data covers.
@@ -249,28 +375,38 @@ autos["price"].describe()
 # * `registration_month`: from the website
 # * `registration_year`: from the website
 # 
-# The non-registration dates i.e. `date_crawled`, `last_seen`, and `ad_created` columns are identified as string values by pandas.We'll need to convert the data of these columns into a numerical representation so we can understand it quantitatively.
+# The non-registration dates i.e. `date_crawled`, `last_seen`, and `ad_created` columns are stored as text in the CSV file. We passed them to `parse_dates` when reading the file, so pandas already converted them into a numerical (datetime) representation that we can understand quantitatively.
 # 
-# The other two columns are represented as numeric values, so we can use methods like `Series.describe()` to understand the distribution without any extra data processing.
+# The other two columns are represented as numeric values, so we can use methods like `Series.describe()` to understand the distribution without any extra data processing, as we already did for `registration_year` above.
 # 
 # We'll explore each of these columns to learn more about the listings.
 
-# In[20]:
+# In[22]:
 
 
-# the three string columns represent full timestamp values, like so:
-autos[['date_crawled','ad_created','last_seen']][0:5]
+# When the cleaning cells were skipped, the cleaned dataframe saved by an earlier run is loaded with the same dtypes
+if USE_CACHE:
+    autos = pd.read_parquet(CLEAN_PATH)
+    print(f'loaded cleaned data from {CLEAN_PATH}')
 
 
-# The first 10 characters represent the day (e.g. 2016-03-12). To understand the date range, we can extract just the date values by using `Series.value_counts()` to generate a distribution, and then sort by the index.
+# In[23]:
 
-# In[21]:
+
+# the three datetime columns represent full timestamp values, like so:
+if DEBUG:
+    display(autos[['date_crawled','ad_created','last_seen']][0:5])
+
+
+# The time of day isn't needed to understand the date range, so we round each timestamp down to its day (e.g. 2016-03-12) with `Series.dt.floor()`. We can then use `Series.value_counts()` to generate a distribution, and then sort by the index.
+
+# In[24]:
 
 
 # To get relative frequencies instead of counts use nomalize=True
 # To include missing values in the distribution use dropna=False
 (autos["date_crawled"]
-        .str[:10] #to select first 10 characters in each column
+        .dt.floor("D") #to round each timestamp down to its day
         .value_counts(normalize=True, dropna=False)  
         .sort_index()
         )
@@ -278,11 +414,11 @@ autos[['date_crawled','ad_created','last_seen']][0:5]
 
 # Looks like the site was crawled daily over roughly a one month period in March and April 2016. The distribution of listings crawled on each day is roughly uniform.
 
-# In[22]:
+# In[25]:
 
 
 (autos["last_seen"]
-        .str[:10]
+        .dt.floor("D")
         .value_counts(normalize=True, dropna=False)
         .sort_index()
         )
@@ -293,12 +429,12 @@ autos[['date_crawled','ad_created','last_seen']][0:5]
 # The last three days contain a disproportionate amount of 'last seen' values. Given that these are 6-10x the values from the previous days, it's unlikely that there was a massive spike in sales, and more likely that these values are to do with the crawling period ending and don't indicate car sales.
 # 
 
-# In[23]:
+# In[26]:
 
 
-print(autos["ad_created"].str[:10].unique().shape)
+print(autos["ad_created"].dt.floor("D").unique().shape)
 (autos["ad_created"]
-        .str[:10]
+        .dt.floor("D")
         .value_counts(normalize=True, dropna=False)
         .sort_index()
         )
@@ -306,53 +442,30 @@ print(autos["ad_created"].str[:10].unique().shape)
 
 # There is a large variety of ad created dates. Most fall within 1-2 months of the listing date, but a few are quite old, with the oldest at around 9 months.
 
-# In[24]:
-
-
-# Using Series.describe() to understand the distribution of registration_year
-autos["registration_year"].describe()
-
-
-# The year that the car was first registered will likely indicate the age of the car. Looking at this column, we note some odd values. The minimum value is `1000`, long before cars were invented and the maximum is `9999`, many years into the future.
-
-# #### Dealing with Incorrect Registration Year Data
-# 
-# Since a car can't be first registered after the listing was seen, any vehicle with a registration year above 2016 is definitely inaccurate. Determining the earliest valid year is more difficult. Realistically, it could be somewhere in the first few decades of the 1900s.
+# When working with data on cars, it's natural to explore variations across different car brands. 
+# We can use **aggregation** to understand the `brand` column.
 # 
-# One option is to remove the listings with these values. Let's determine what percentage of our data has invalid values (listings that fall outside the 1900 - 2016 intrval) in this column and see if it's safe to remove those rows entirely or we need more custom logic.
 # 
 
-# In[27]:
-
-
-(~autos["registration_year"].between(1900,2016)).sum() / autos.shape[0]
-
-
-# Given that this is less than 4% of our data, we will remove these rows.
+# ### Exploring brand column
 
-# In[28]:
+# The `brand` column, like the other text columns with only a few distinct values, is stored as a category, so `value_counts()` and `groupby()` work on integer codes instead of strings. The categories of the rows we removed are still part of each column's dtype though, so we drop them before aggregating.
 
+# In[27]:
 
-# Select rows that fall within a value range of `registration_year` column using `Series.between()`
-autos = autos[autos["registration_year"].between(1900,2016)]
-# Calculating distribution of remaining values
-autos["registration_year"].value_counts(normalize=True).head(10)
 
+# Removing categories that no longer appear in any of the remaining rows
+for col in ['ab_test', 'vehicle_type', 'gearbox', 'fuel_type', 'brand', 'unrepaired_damage']:
+    autos[col] = autos[col].cat.remove_unused_categories()
 
-# It appears that most of the vehicles were first registered in the past 20 years.
 
-# When working with data on cars, it's natural to explore variations across different car brands. 
-# We can use **aggregation** to understand the `brand` column.
-# 
-# 
-
-# ### Exploring brand column
-
-# In[31]:
+# In[28]:
 
 
 # Obtaining the relative frequencies (normalize=True) of unique brands and excluding NA values by default.
-autos["brand"].value_counts(normalize=True)
+# The result is stored so we can reuse it to select the common brands below
+brand_counts = autos["brand"].value_counts(normalize=True)
+brand_counts
 
 
 # 
@@ -360,10 +473,9 @@ autos["brand"].value_counts(normalize=True)
 # 
 # There are lots of brands that don't have a significant percentage of listings, so we will limit our analysis to brands representing more than 5% of total listings.
 
-# In[34]:
+# In[29]:
 
 
-brand_counts = autos["brand"].value_counts(normalize=True)
 # Series.value_counts() produces a series with index labels which can be accessed by using Series.index attribute
 # assigning the index of modified brand_counts to common_brands
 common_brands = brand_counts[brand_counts > .05].index
@@ -372,21 +484,20 @@ print(common_brands)
 
 # #### Exploring brand by price
 # 
-# Using `Series.mean()` to calculate mean price of cars of common brands obtained above.
+# Using `DataFrame.groupby()` with named aggregations to calculate the mean price (and mean mileage, which we'll look at next) of the common brands obtained above in a single pass.
 
-# In[36]:
+# In[30]:
 
 
-# Creating an empty dictionary to store our aggregate data
-brand_mean_prices = {}
-
-# Loop over the unique values
-for brand in common_brands:
-    brand_only = autos[autos["brand"] == brand] # Subset the dataframe by the unique values
-    mean_price = brand_only["price"].mean() # Calculate the mean of price column
-    brand_mean_prices[brand] = int(mean_price) # Assigning value of mean price to key of that brand
-
-brand_mean_prices
+# Keeping only the rows of common brands first means the groupby only has to partition those rows
+# Each named aggregation gives a column name and the (column, function) pair that calculates it,
+# and observed=True leaves out the categories of the other brands
+brand_info = (autos[autos["brand"].isin(common_brands)]
+                    .groupby("brand", observed=True)
+                    .agg(mean_mileage=("odometer_km", "mean"), mean_price=("price", "mean"))
+                    .astype(int)
+                    )
+brand_info["mean_price"].sort_values(ascending=False)
 
 
 # Of the top 5 brands, there is a distinct price gap:
@@ -407,50 +518,13 @@ brand_mean_prices
 # * we can't compare more than a few rows from each series object
 # * we can only sort by the index (brand name) of both series objects so we can easily make visual comparisons
 # 
-# Instead, we can combine the data from both series objects into a single dataframe (with a shared index) and display the dataframe directly. 
-
-# In[42]:
-
-
-# the series constructor method uses brand_mean_prices dictionary
-bmp_series = pd.Series(brand_mean_prices)
-# The keys in the dictionary became the index in the series object
-print(bmp_series)
-# We can now create a single-column dataframe from this series object
-# We need to use the columns parameter when calling the dataframe constructor (which accepts a array-like object) to specify the column name (or the column name will be set to 0 by default)
-pd.DataFrame(bmp_series, columns=["mean_price"])
-
-
-# In[43]:
-
-
-# Creating an empty dictionary to store our aggregate data
-
-brand_mean_mileage = {}
+# Instead, we can keep the data in a single dataframe (with a shared index) and display the dataframe directly. The `brand_info` dataframe we created with named aggregations already holds both aggregates under descriptive column names.
 
-for brand in common_brands:
-    brand_only = autos[autos["brand"] == brand]
-    mean_mileage = brand_only["odometer_km"].mean()
-    brand_mean_mileage[brand] = int(mean_mileage)
-
-# Converting both dictionaries to series objects, using the series constructor    
-mean_mileage = pd.Series(brand_mean_mileage).sort_values(ascending=False)
-mean_prices = pd.Series(brand_mean_prices).sort_values(ascending=False)
-
-
-# In[44]:
-
-
-# Creating a dataframe from the first series (mean_mileage) object using the dataframe constructor
-brand_info = pd.DataFrame(mean_mileage,columns=['mean_mileage'])
-brand_info
-
-
-# In[45]:
+# In[31]:
 
 
-# Assigning the other series (mean_prices) as a new column in this dataframe.
-brand_info["mean_price"] = mean_prices
+# Sorting the brands by mean mileage to look for a link with mean price
+brand_info = brand_info.sort_values("mean_mileage", ascending=False)
 brand_info
 
 